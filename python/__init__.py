@@ -4,3 +4,6 @@ from .azel_limit import AzElLimit
 from .MsgPairToVar import MsgPairToVar
 from .vartomsg import VarToMsgPair
 from .vel_doppler import vel_doppler
+from .doppler_channelizer import doppler_channelizer
+from .freq_history import FrequencyHistory
+from .burst_doppler_correct import burst_doppler_correct
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+#
+# Doppler correction of timestamped burst PDUs from the frequency history
+#
+
+from gnuradio import gr
+import numpy as np
+import pmt
+
+from .freq_history import FrequencyHistory
+
+class burst_doppler_correct(gr.sync_block):
+  """
+  De-rotates each burst PDU using the frequency trajectory that was in effect
+  while it was received, interpolated from a timestamped frequency history at
+  the burst start and end.
+  """
+  def __init__(self, samp_rate, nominal_freq=0.0, time_key="rx_time", history_size=1024, verbose=False, history=None):
+    gr.sync_block.__init__(self, name = "Burst Doppler Correct", in_sig = None, out_sig = None)
+
+    self.samp_rate = float(samp_rate)
+    self.nominal_freq = float(nominal_freq)
+    self.time_key = pmt.intern(time_key)
+    self.verbose = verbose
+
+    # Share the doppler / vel_doppler block's history when given, otherwise
+    # build one from the freq messages arriving on our own port.
+    self.history_shared = history is not None
+    if history is None:
+      history = FrequencyHistory(history_size)
+    self.history = history
+
+    # Frequency the history values are taken relative to: our own setting if
+    # given, otherwise whatever the history producer knows (vel_doppler's
+    # known frequency; the doppler block can't know it).
+    self.reference = self.nominal_freq if self.nominal_freq != 0.0 else self.history.nominal
+    if self.history_shared and self.reference == 0.0:
+      print("[burst_doppler_correct] WARNING shared history holds absolute frequencies but Nominal Frequency is 0.  Set it to the transmit frequency or bursts will be de-rotated by the full carrier.")
+
+    self.message_port_register_in(pmt.intern("freq"))
+    self.set_msg_handler(pmt.intern("freq"), self.freqHandler)
+
+    self.message_port_register_in(pmt.intern("pdus"))
+    self.set_msg_handler(pmt.intern("pdus"), self.pduHandler)
+
+    self.message_port_register_out(pmt.intern("pdus"))
+
+  def freqHandler(self, pdu):
+    # A shared history is filled by its own block; appending here would record
+    # every update twice and write to it from a second thread.
+    if self.history_shared:
+      if self.verbose: print("[burst_doppler_correct] Using shared history, ignoring freq message")
+      return
+
+    try:
+      self.history.append(float(pmt.to_python(pmt.cdr(pdu))))
+    except Exception as e:
+      print("[burst_doppler_correct] Error with freq message: %s" % str(e))
+
+  def burstTime(self, meta):
+    t = pmt.dict_ref(meta, self.time_key, pmt.PMT_NIL)
+    if pmt.is_null(t):
+      return None
+
+    t = pmt.to_python(t)
+    if isinstance(t, (tuple, list)):
+      # UHD style (full seconds, fractional seconds)
+      return float(t[0]) + float(t[1])
+
+    return float(t)
+
+  def pduHandler(self, pdu):
+    try:
+      out = self.correctBurst(pdu)
+    except Exception as e:
+      print("[burst_doppler_correct] Error with burst, passing through uncorrected: %s" % str(e))
+      out = pdu
+
+    self.message_port_pub(pmt.intern("pdus"), out)
+
+  def correctBurst(self, pdu):
+    meta = pmt.car(pdu)
+    if not pmt.is_c32vector(pmt.cdr(pdu)):
+      raise ValueError("PDU payload is not a complex (c32) vector")
+
+    # Converted to a numpy array once so the de-rotation stays vectorized
+    samples = np.asarray(pmt.to_python(pmt.cdr(pdu)), dtype=np.complex64)
+
+    if not pmt.is_dict(meta):
+      meta = pmt.make_dict()
+
+    if len(samples) == 0:
+      if self.verbose: print("[burst_doppler_correct] Empty burst, passing through")
+      return pdu
+
+    start = self.burstTime(meta)
+    if start is None:
+      if self.verbose: print("[burst_doppler_correct] No %s on burst, passing through" % pmt.symbol_to_string(self.time_key))
+      return pdu
+
+    duration = len(samples) / self.samp_rate
+    freqs = self.history.lookup([start, start + duration])
+    if freqs is None:
+      if self.verbose: print("[burst_doppler_correct] No frequency history yet, passing through")
+      return pdu
+
+    f0 = freqs[0] - self.reference
+    f1 = freqs[1] - self.reference
+
+    # Linear frequency ramp across the burst, integrated to phase
+    t = np.arange(len(samples)) / self.samp_rate
+    phase = 2.0 * np.pi * (f0 * t + (f1 - f0) * t * t / (2.0 * duration))
+    corrected = (samples * np.exp(-1j * phase)).astype(np.complex64)
+
+    if self.verbose: print("[burst_doppler_correct] Burst at %f: %.1f Hz -> %.1f Hz" % (start, f0, f1))
+
+    meta = pmt.dict_add(meta, pmt.intern("doppler_start"), pmt.from_double(f0))
+    meta = pmt.dict_add(meta, pmt.intern("doppler_end"), pmt.from_double(f1))
+    return pmt.cons(meta, pmt.init_c32vector(len(corrected), corrected))
@@ -21,6 +21,8 @@ import time
 import socket
 import pmt
 
+from .freq_history import FrequencyHistory
+
 class doppler_runner(threading.Thread):
   def __init__(self, bc, gpredict_host, gpredict_port, verbose):
     threading.Thread.__init__(self)
@@ -115,11 +117,13 @@ class doppler_runner(threading.Thread):
    
 
 class doppler(gr.sync_block):
-  def __init__(self, gpredict_host, gpredict_port, verbose):
+  def __init__(self, gpredict_host, gpredict_port, verbose, history_size=1024):
     gr.sync_block.__init__(self, name = "GPredict Doppler", in_sig = None, out_sig = None)
     
     # Init block variables
     self.port = gpredict_port
+    # Timestamped record of published frequencies, e.g. for burst_doppler_correct
+    self.history = FrequencyHistory(history_size)
     self.thread = doppler_runner(self, gpredict_host, gpredict_port, verbose)
     self.thread.start()
     self.message_port_register_out(pmt.intern("freq"))
@@ -146,6 +150,7 @@ class doppler(gr.sync_block):
     return True
     
   def sendFreq(self,freq):
+    self.history.append(freq)
     p = pmt.from_double(freq)
     self.message_port_pub(pmt.intern("freq"),pmt.cons(pmt.intern("freq"),p))
     
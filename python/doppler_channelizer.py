@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+#
+# Polyphase channelizer with per-channel Doppler correction
+#
+
+from gnuradio import gr
+from gnuradio import filter as grfilter
+import numpy as np
+import pmt
+
+class doppler_channelizer(gr.decim_block):
+  """
+  Splits a wideband input into num_chans critically sampled channels with a
+  single polyphase filter / FFT pass, then removes each channel's Doppler
+  offset with a per-channel fine NCO running at the channel rate.
+
+  Output k is the channel centered at k*samp_rate/num_chans (FFT order, so
+  the upper half of the outputs are the negative frequency channels).
+  """
+  def __init__(self, samp_rate, num_chans, taps=[], nominal_freqs=[], verbose=False):
+    num_chans = int(num_chans)
+    if num_chans < 1:
+      raise ValueError("[doppler_channelizer] num_chans must be at least 1, got %d" % num_chans)
+
+    gr.decim_block.__init__(self, name = "Doppler Channelizer", in_sig = [np.complex64],
+                            out_sig = [np.complex64] * num_chans, decim = num_chans)
+
+    self.samp_rate = float(samp_rate)
+    self.num_chans = num_chans
+    self.chan_rate = self.samp_rate / num_chans
+    self.verbose = verbose
+
+    if len(taps) == 0:
+      taps = grfilter.firdes.low_pass(1.0, self.samp_rate, 0.4 * self.chan_rate, 0.2 * self.chan_rate)
+
+    # Polyphase partition: row q holds taps[q*M:(q+1)*M], zero padded to a full row
+    M = num_chans
+    self.taps_per_chan = int(np.ceil(len(taps) / float(M)))
+    padded = np.zeros(self.taps_per_chan * M, dtype=np.float32)
+    padded[:len(taps)] = taps
+    self.poly_taps = padded.reshape(self.taps_per_chan, M)
+
+    # Usable offset range: where the prototype response is within 1 dB of DC,
+    # capped at half the channel rate.  With the default taps this is about 0.3
+    # to 0.35 times the channel rate.
+    response = np.abs(np.fft.rfft(padded, 64 * len(padded)))
+    rolledOff = response < response[0] * 10 ** (-1.0 / 20.0)
+    passband = np.argmax(rolledOff) if np.any(rolledOff) else len(response)
+    self.max_offset = min(passband * self.samp_rate / (64 * len(padded)), self.chan_rate / 2.0)
+
+    # Each output sample is referenced to the last input sample of its block,
+    # which leaves a constant phase term per channel after the FFT.
+    k = np.arange(M)
+    self.chan_rotation = (M * np.exp(-2j * np.pi * k * (M - 1) / M)).astype(np.complex64)
+
+    self.history = np.zeros((self.taps_per_chan - 1) * M, dtype=np.complex64)
+
+    # If nominal frequencies are given, incoming values are absolute frequencies
+    # (e.g. from the doppler block) and the offset is taken relative to them.
+    # Otherwise incoming values are already the shift (e.g. vel_doppler freqshift).
+    if len(nominal_freqs) > 0 and len(nominal_freqs) != num_chans:
+      raise ValueError("[doppler_channelizer] nominal_freqs must have one entry per channel")
+    self.nominal_freqs = np.array(nominal_freqs, dtype=np.float64) if len(nominal_freqs) > 0 else np.zeros(num_chans)
+
+    self.offsets = np.zeros(num_chans, dtype=np.float64)
+    self.phase = np.zeros(num_chans, dtype=np.float64)
+    self.overLimit = np.zeros(num_chans, dtype=bool)
+
+    # Vector of all channel offsets at once
+    self.message_port_register_in(pmt.intern("doppler"))
+    self.set_msg_handler(pmt.intern("doppler"), self.dopplerHandler)
+
+    # One scalar frequency port per channel, compatible with the doppler / vel_doppler outputs.
+    # Named the way GRC expands a message port multiplicity: a single port keeps
+    # its id, otherwise the ports are freq0, freq1, ... freqN-1
+    for chan in range(num_chans):
+      portName = "freq" if num_chans == 1 else "freq%d" % chan
+      self.message_port_register_in(pmt.intern(portName))
+      self.set_msg_handler(pmt.intern(portName), lambda msg, chan=chan: self.freqHandler(chan, msg))
+
+  def dopplerHandler(self, pdu):
+    try:
+      if pmt.is_pair(pdu):
+        values = pmt.to_python(pmt.cdr(pdu))
+      else:
+        values = pmt.to_python(pdu)
+
+      values = np.asarray(values, dtype=np.float64).ravel()
+
+      if len(values) != self.num_chans:
+        print("[doppler_channelizer] Expected %d Doppler values, got %d" % (self.num_chans, len(values)))
+        return
+
+      self.setOffsets(values - self.nominal_freqs)
+    except Exception as e:
+      print("[doppler_channelizer] Error with doppler message: %s" % str(e))
+
+  def freqHandler(self, chan, pdu):
+    try:
+      newFreq = float(pmt.to_python(pmt.cdr(pdu)))
+
+      offsets = self.offsets.copy()
+      offsets[chan] = newFreq - self.nominal_freqs[chan]
+      self.setOffsets(offsets)
+    except Exception as e:
+      print("[doppler_channelizer] Error with freq message on channel %d: %s" % (chan, str(e)))
+
+  def setOffsets(self, offsets):
+    # Warn once when a channel leaves the passband, not on every update of a pass
+    overLimit = np.abs(offsets) > self.max_offset
+    for chan in np.flatnonzero(overLimit & ~self.overLimit):
+      print("[doppler_channelizer] WARNING Doppler offset on channel %d exceeds the channel filter passband (%.1f Hz)" % (chan, self.max_offset))
+    self.overLimit = overLimit
+
+    if self.verbose: print("[doppler_channelizer] New offsets: %s" % str(offsets))
+
+    # Swap the whole array so work() never sees a partial update
+    self.offsets = offsets
+
+  def work(self, input_items, output_items):
+    M = self.num_chans
+    Q = self.taps_per_chan
+    noutput = len(output_items[0])
+
+    x = np.concatenate((self.history, input_items[0][:noutput * M]))
+    if len(self.history) > 0:
+      self.history = x[-len(self.history):].copy()
+
+    # Commutator: one row per input block, reversed so column p is x[cur - p]
+    rows = x.reshape(-1, M)[:, ::-1]
+
+    # Polyphase filter, one branch per column, vectorized over all output samples
+    branches = np.zeros((noutput, M), dtype=np.complex64)
+    for q in range(Q):
+      branches += rows[Q - 1 - q:Q - 1 - q + noutput] * self.poly_taps[q]
+
+    chans = np.fft.ifft(branches, axis=1) * self.chan_rotation
+
+    # Fine NCOs: continuous phase per channel at the channel rate
+    offsets = self.offsets
+    step = 2.0 * np.pi * offsets / self.chan_rate
+    phases = self.phase + np.outer(np.arange(noutput), step)
+    self.phase = np.mod(self.phase + noutput * step, 2.0 * np.pi)
+    chans *= np.exp(-1j * phases)
+
+    for chan in range(M):
+      output_items[chan][:] = chans[:, chan]
+
+    return noutput
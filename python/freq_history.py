@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+#
+# Bounded, time-indexed history of published frequencies
+#
+
+import threading
+import time
+import numpy as np
+
+class FrequencyHistory(object):
+  """
+  Ring buffer of (timestamp, frequency) pairs.  Every entry is written twice,
+  at i and i+size, so the newest `count` entries are always one contiguous,
+  time-ordered slice and lookups are a binary search instead of a scan.
+
+  nominal is the frequency the recorded values are relative to, so a reader
+  can turn them into a shift (0 if the values are already the shift or the
+  nominal is unknown to the producer).
+  """
+  def __init__(self, size=1024, nominal=0.0):
+    if int(size) < 1:
+      raise ValueError("[freq_history] History size must be at least 1, got %s" % str(size))
+
+    self.size = int(size)
+    self.nominal = float(nominal)
+    self.times = np.zeros(2 * self.size, dtype=np.float64)
+    self.freqs = np.zeros(2 * self.size, dtype=np.float64)
+    self.next = 0
+    self.count = 0
+    self.lock = threading.Lock()
+
+  def __len__(self):
+    return self.count
+
+  def append(self, freq, timestamp=None):
+    if timestamp is None:
+      timestamp = time.time()
+
+    with self.lock:
+      # Timestamps must be strictly increasing.  An update in the same clock
+      # tick, or after the clock stepped back, replaces the newest entry.
+      if self.count > 0:
+        last = self.next + self.size - 1
+        if timestamp <= self.times[last]:
+          self.freqs[last] = self.freqs[last - self.size] = freq
+          return
+
+      self.times[self.next] = self.times[self.next + self.size] = timestamp
+      self.freqs[self.next] = self.freqs[self.next + self.size] = freq
+      self.next = (self.next + 1) % self.size
+      self.count = min(self.count + 1, self.size)
+
+  def _window(self):
+    end = self.next + self.size
+    return self.times[end - self.count:end], self.freqs[end - self.count:end]
+
+  def lookup(self, timestamps):
+    """
+    Returns the frequency at each timestamp, linearly interpolated between the
+    recorded updates.  Times outside the recorded span hold the nearest value.
+    Returns None if nothing has been recorded yet.
+    """
+    with self.lock:
+      if self.count == 0:
+        return None
+
+      times, freqs = self._window()
+      timestamps = np.asarray(timestamps, dtype=np.float64)
+
+      if self.count == 1:
+        return np.full(timestamps.shape, freqs[0])
+
+      # times is strictly increasing, so every bracketing span is non-zero
+      idx = np.clip(np.searchsorted(times, timestamps, side='right'), 1, self.count - 1)
+      t0 = times[idx - 1]
+      t1 = times[idx]
+      f0 = freqs[idx - 1]
+      f1 = freqs[idx]
+      frac = np.clip((timestamps - t0) / (t1 - t0), 0.0, 1.0)
+      result = f0 + frac * (f1 - f0)
+
+      # Hold the nearest value outside the recorded span
+      result[timestamps <= times[0]] = freqs[0]
+      result[timestamps >= times[-1]] = freqs[-1]
+
+      return result
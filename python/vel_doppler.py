@@ -10,6 +10,8 @@ import time
 import socket
 import pmt
 
+from .freq_history import FrequencyHistory
+
 # NOTE FOR DOPPLER CALCULATION:
 # Negative velocities are towards you,
 # Positive velocities are away from you.
@@ -99,7 +101,7 @@ class doppler_runner(threading.Thread):
               # Calc new frequencies
               self.blockclass.curVel = vel
               self.blockclass.currentFrequency = doppler_shift(self.blockclass.knownFrequency, vel)
-              self.blockclass.sendFreqency(self.blockclass.currentFrequency)
+              self.blockclass.sendFrequency(self.blockclass.currentFrequency)
               shift = self.blockclass.currentFrequency - self.blockclass.knownFrequency 
               self.blockclass.sendFrequencyShift(shift)
             
@@ -141,7 +143,7 @@ class doppler_runner(threading.Thread):
     self.server = None
 
 class vel_doppler(gr.sync_block):
-  def __init__(self, knownFrequency, initVelocity, host, port, verbose):
+  def __init__(self, knownFrequency, initVelocity, host, port, verbose, history_size=1024):
     gr.sync_block.__init__(self, name = "GPredict Velocity Doppler", in_sig = None, out_sig = None)
     
     self.host = host
@@ -153,6 +155,9 @@ class vel_doppler(gr.sync_block):
     self.initialVelocity = initVelocity
     self.curVel = initVelocity
 
+    # Timestamped record of published frequencies, e.g. for burst_doppler_correct
+    self.history = FrequencyHistory(history_size, knownFrequency)
+
     # Inbound velocity message on port
     self.message_port_register_in(pmt.intern("velocity"))
     self.set_msg_handler(pmt.intern("velocity"), self.velMsgHandler)   
@@ -200,6 +205,7 @@ class vel_doppler(gr.sync_block):
     return True
     
   def sendFrequency(self,freq):
+    self.history.append(freq)
     self.message_port_pub(pmt.intern("frequency"),pmt.cons( pmt.intern("freq"), pmt.from_double(freq) ))
 
   def sendFrequencyShift(self,freqshift):